@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS class_details (
+    endpoint TEXT NOT NULL,
+    term TEXT NOT NULL,
+    crn TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    PRIMARY KEY (endpoint, term, crn)
+)
+"""
+_SELECT_SQL = (
+    "SELECT payload, fetched_at FROM class_details "
+    "WHERE endpoint = ? AND term = ? AND crn = ?"
+)
+_DELETE_OTHER_VERSIONS_SQL = "DELETE FROM class_details WHERE endpoint NOT LIKE ?"
+_INSERT_SQL = (
+    "INSERT OR REPLACE INTO class_details (endpoint, term, crn, payload, fetched_at) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+class DetailCache:
+    """
+    On-disk SQLite cache of class detail endpoint results, keyed by endpoint, parser
+    version, term code, and CRN. Results cached by other parser versions are deleted
+    when the cache is opened, so parser fixes also apply to past terms.
+
+    Results for terms that ended before the current term never expire, since their
+    data no longer changes. Results for the current and upcoming terms expire after
+    active_ttl seconds so that re-scrapes pick up changes to classes still open for
+    registration.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | str,
+        parser_version: int,
+        current_term: str,
+        active_ttl: int = 600,
+    ) -> None:
+        """
+        @param db_path: Path to the SQLite database file. Created if it doesn't exist.
+        @param parser_version: Version of the class detail parsers whose results are
+            cached, e.g. sis_api.DETAIL_PARSER_VERSION.
+        @param current_term: Code of the term in progress. Results for earlier terms
+            never expire.
+        @param active_ttl: Time in seconds that results for current and upcoming terms
+            remain valid.
+        """
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._active_ttl = active_ttl
+        self._endpoint_suffix = f"@v{parser_version}"
+        self._current_term = current_term
+        # The connection is used from worker threads, one at a time
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_CREATE_TABLE_SQL)
+        self._conn.execute(_DELETE_OTHER_VERSIONS_SQL, (f"%{self._endpoint_suffix}",))
+        self._conn.commit()
+        self._hits = 0
+        self._misses = 0
+
+    def __enter__(self) -> "DetailCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the underlying database connection and logs cache statistics.
+        """
+        logger.info(
+            f"Detail cache closed with {self._hits} hits and {self._misses} misses"
+        )
+        with self._lock:
+            self._conn.close()
+
+    def _is_fresh(self, term: str, fetched_at: int) -> bool:
+        """
+        Checks whether a cached result is still valid.
+
+        @param term: Term code of the cached result.
+        @param fetched_at: Unix timestamp of when the result was fetched.
+        @return: True if the result can be used, otherwise False.
+        """
+        if term < self._current_term:
+            return True
+        return time.time() - fetched_at < self._active_ttl
+
+    def _load(self, endpoint: str, term: str, crn: str) -> tuple[bytes, int] | None:
+        with self._lock:
+            return self._conn.execute(_SELECT_SQL, (endpoint, term, crn)).fetchone()
+
+    def _store(self, endpoint: str, term: str, crn: str, payload: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                _INSERT_SQL, (endpoint, term, crn, payload, int(time.time()))
+            )
+            self._conn.commit()
+
+    async def fetch(
+        self,
+        fetcher: Callable[[aiohttp.ClientSession, str, str], Awaitable[Any]],
+        session: aiohttp.ClientSession,
+        term: str,
+        crn: str,
+    ) -> Any:
+        """
+        Returns the cached result of a class detail fetcher, calling the fetcher and
+        caching its result on a miss.
+
+        @param fetcher: A class detail fetcher from sis_api, e.g.
+            get_class_description. Its name and the parser version are used as the
+            cache endpoint key.
+        @param session: An aiohttp ClientSession to pass to the fetcher.
+        @param term: The term code of the class.
+        @param crn: The course reference number of the class.
+        @return: The result of the fetcher, either cached or freshly fetched.
+        """
+        endpoint = fetcher.__name__ + self._endpoint_suffix
+        row = await asyncio.to_thread(self._load, endpoint, term, crn)
+        if row is not None and self._is_fresh(term, row[1]):
+            self._hits += 1
+            return orjson.loads(row[0])
+        self._misses += 1
+        data = await fetcher(session, term, crn)
+        await asyncio.to_thread(self._store, endpoint, term, crn, orjson.dumps(data))
+        return data
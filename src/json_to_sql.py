@@ -301,6 +301,12 @@ def process_term(
             if course_code in processed_courses:
                 continue
             processed_courses.add(course_code)
+            # Courses with a fixed number of credits have no maximum, but a maximum of 0
+            # is a real value and must not fall back to the minimum
+            credit_min = main_section["creditMin"]
+            credit_max = main_section["creditMax"]
+            if credit_max is None:
+                credit_max = credit_min
             # Add course model
             course_models.append(
                 models.Course(
@@ -308,8 +314,8 @@ def process_term(
                     code_num=course_num,
                     title=main_section["title"],
                     desc_text=main_section["description"],
-                    credit_min=main_section["creditMin"],
-                    credit_max=main_section["creditMax"] or main_section["creditMin"],
+                    credit_min=credit_min,
+                    credit_max=credit_max,
                 )
             )
             # Add course attribute models
@@ -530,11 +536,7 @@ def main(
         db_manager.close_connection()
 
     except Exception as e:
-        import traceback
-
-        logger.fatal(
-            f"Error during JSON to SQL conversion: {e}\n{traceback.format_exc()}"
-        )
+        logger.fatal(f"Error during JSON to SQL conversion: {e}", exc_info=True)
         return False
 
     return True
@@ -1,8 +1,10 @@
+import atexit
 import datetime as dt
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 
@@ -45,6 +47,9 @@ def init_logging(
     Initializes logging settings once on startup; these settings determine the
     behavior of all logging calls within this program.
 
+    Log records are passed through a queue to a background listener thread that
+    formats and writes them, so logging calls never block on console or file I/O.
+
     @param logs_dir: Directory where log files will be stored.
     @param log_level: Minimum logging level to be logged.
     @param retention_days: Number of days to keep log files before deletion.
@@ -86,11 +91,17 @@ def init_logging(
     # logging because colors would just render as text.
     file_handler.setFormatter(default_formatter)
 
-    # Add handlers to root logger
+    # Add queue handler to root logger, with the listener writing to the handlers
+    log_queue = queue.SimpleQueue()
+    queue_listener = QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    queue_listener.start()
+    # Flush remaining records on exit
+    atexit.register(queue_listener.stop)
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
+    root_logger.addHandler(QueueHandler(log_queue))
 
     # Log log directory creation after handlers are added
     if not logs_dir_exists:
@@ -12,6 +12,14 @@ import postprocess
 import sis_scraper
 from logging_config import init_logging
 
+# uvloop does not support Windows, where the default asyncio event loop is used
+if sys.platform != "win32":
+    import uvloop
+
+    loop_factory = uvloop.new_event_loop
+else:
+    loop_factory = None
+
 if __name__ == "__main__":
     # Parse command-line arguments
     parser = argparse.ArgumentParser(
@@ -26,6 +34,12 @@ if __name__ == "__main__":
     scrape_parser.add_argument(
         "end_year", type=int, help="The year at which to stop scraping, inclusive."
     )
+    scrape_parser.add_argument(
+        "--skip-unchanged-closed-terms",
+        action="store_true",
+        help="Skip terms that have ended if their subject list is unchanged since they "
+        "were last scraped. Changes to their classes are not detected.",
+    )
     subparsers.add_parser("postprocess", help="Process scraped JSON data.")
     subparsers.add_parser("commitdb", help="Commit processed data to the database.")
     args = parser.parse_args()
@@ -74,16 +88,27 @@ if __name__ == "__main__":
         )
         sys.exit(1)
 
+    # The class detail cache is optional and disabled if its path is not set
+    detail_cache_path = os.getenv("SCRAPER_DETAIL_CACHE_PATH")
+    if detail_cache_path:
+        detail_cache_path = parent_dir / detail_cache_path
+    else:
+        detail_cache_path = None
+
     init_logging(logs_dir, log_level=logging.INFO)
 
     if args.command == "scrape":
-        if not asyncio.run(
-            sis_scraper.main(
-                output_data_dir=output_data_dir,
-                start_year=args.start_year,
-                end_year=args.end_year,
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            success = runner.run(
+                sis_scraper.main(
+                    output_data_dir=output_data_dir,
+                    start_year=args.start_year,
+                    end_year=args.end_year,
+                    detail_cache_path=detail_cache_path,
+                    skip_unchanged_closed_terms=args.skip_unchanged_closed_terms,
+                )
             )
-        ):
+        if not success:
             sys.exit(1)
 
     elif args.command == "postprocess":
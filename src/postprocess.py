@@ -1,12 +1,22 @@
-import json
 import logging
 import re
-import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Matches an attribute in the format "Name  Code" (two spaces)
+_ATTRIBUTE_RE = re.compile(r"(.+)  (.+)")
+# Matches a restriction in the format "Name (Code)"
+_RESTRICTION_RE = re.compile(r"(.+)\s*\((.+)\)")
+# Matches runs of whitespace in an instructor name
+_WHITESPACE_RE = re.compile(r"\s+")
+# Email domain of RPI instructors, whose RCSID is the local part of their email
+_RPI_EMAIL_SUFFIX = "@rpi.edu"
+
 
 class CodeMapper:
     """
@@ -30,12 +40,25 @@ class CodeMapper:
         self.restriction_path = Path(restriction_path)
         self.subject_path = Path(subject_path)
 
-        self.attributes = self._load_json(self.attribute_path)
-        self.generated_instructors = self._load_json(self.generated_instructor_path)
-        self.instructors = self._load_json(self.instructor_path)
-        self.restrictions = self._load_json(self.restriction_path)
+        # Load all code mappings concurrently, since each is an independent file
+        with ThreadPoolExecutor() as executor:
+            (
+                self.attributes,
+                self.generated_instructors,
+                self.instructors,
+                self.restrictions,
+                self.subjects,
+            ) = executor.map(
+                self._load_json,
+                (
+                    self.attribute_path,
+                    self.generated_instructor_path,
+                    self.instructor_path,
+                    self.restriction_path,
+                    self.subject_path,
+                ),
+            )
         self._normalize_restrictions()
-        self.subjects = self._load_json(self.subject_path)
 
         # Reverse map for subject name to code lookup
         self.subject_name_to_code = {v: k for k, v in self.subjects.items()}
@@ -62,10 +85,9 @@ class CodeMapper:
             target_type = r_type
             if r_type.startswith("not_"):
                 target_type = r_type[4:]
-            if target_type not in normalized:
-                normalized[target_type] = {}
+            normalized_codes = normalized.setdefault(target_type, {})
             for code, name in codes.items():
-                normalized[target_type][code] = name.strip()
+                normalized_codes[code] = name.strip()
         self.restrictions = normalized
 
     def _load_json(self, path: Path | str) -> dict:
@@ -79,10 +101,9 @@ class CodeMapper:
         path = Path(path)
         if path.exists() and not path.is_dir():
             try:
-                with path.open("r", encoding="utf-8") as f:
-                    logger.info(f"Loading existing code mapping from {path}")
-                    return json.load(f)
-            except json.JSONDecodeError as e:
+                logger.info(f"Loading existing code mapping from {path}")
+                return orjson.loads(path.read_bytes())
+            except orjson.JSONDecodeError as e:
                 logger.error(f"Error decoding JSON from {path}: {e}")
         return {}
 
@@ -94,26 +115,40 @@ class CodeMapper:
         @param path: Path to the JSON file to save.
         @param data: Dictionary containing the data to save to JSON.
         """
-        # Sort keys for consistent output
-        sorted_data = dict(sorted(data.items()))
-        # For nested dicts (restrictions), sort inner keys too
-        if path == self.restriction_path:
-            sorted_data = {k: dict(sorted(v.items())) for k, v in sorted_data.items()}
-
         path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(sorted_data, f, indent=4, ensure_ascii=False)
+        # Sort keys for consistent output, including the inner keys of nested dicts
+        # (restrictions)
+        path.write_bytes(
+            orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        )
 
     def save(self) -> None:
         """
         Saves the current mappings to their respective JSON files. Existing files will be
         overwritten with the updated mappings. Keys are sorted for consistent output.
         """
-        self._save_json(self.attribute_path, self.attributes)
-        self._save_json(self.generated_instructor_path, self.generated_instructors)
-        self._save_json(self.instructor_path, self.instructors)
-        self._save_json(self.restriction_path, self.restrictions)
-        self._save_json(self.subject_path, self.subjects)
+        # Save all code mappings concurrently, since each is an independent file.
+        # Results are consumed so that any error is raised here.
+        with ThreadPoolExecutor() as executor:
+            list(
+                executor.map(
+                    self._save_json,
+                    (
+                        self.attribute_path,
+                        self.generated_instructor_path,
+                        self.instructor_path,
+                        self.restriction_path,
+                        self.subject_path,
+                    ),
+                    (
+                        self.attributes,
+                        self.generated_instructors,
+                        self.instructors,
+                        self.restrictions,
+                        self.subjects,
+                    ),
+                )
+            )
 
     def add_subject(self, code: str, name: str) -> None:
         """
@@ -124,13 +159,14 @@ class CodeMapper:
         @param code: Subject code to add.
         @param name: Subject name to add.
         """
-        if code in self.subjects and self.subjects[code] != name:
+        existing_name = self.subjects.setdefault(code, name)
+        if existing_name != name:
             logger.warning(
                 f"Conflicting subject name for code {code}: "
-                f"'{self.subjects[code]}' vs '{name}'"
+                f"'{existing_name}' vs '{name}'"
             )
-        # Update code to name mapping regardless of whether a conflict exists
-        self.subjects[code] = name
+            # Override the existing name to ensure the most recent name is used
+            self.subjects[code] = name
         self.subject_name_to_code[name] = code
 
     def add_attribute(self, code: str, name: str) -> None:
@@ -142,13 +178,14 @@ class CodeMapper:
         @param code: Attribute code to add.
         @param name: Attribute name to add.
         """
-        if code in self.attributes and self.attributes[code] != name:
+        existing_name = self.attributes.setdefault(code, name)
+        if existing_name != name:
             logger.warning(
                 f"Conflicting attribute name for code {code}: "
-                f"'{self.attributes[code]}' vs '{name}'"
+                f"'{existing_name}' vs '{name}'"
             )
-        # Update code to name mapping regardless of whether a conflict exists
-        self.attributes[code] = name
+            # Override the existing name to ensure the most recent name is used
+            self.attributes[code] = name
 
     def add_restriction(self, r_type: str, code: str, name: str) -> None:
         """
@@ -167,18 +204,16 @@ class CodeMapper:
         """
         if r_type.startswith("not_"):
             r_type = r_type[4:]
-        if r_type not in self.restrictions:
-            self.restrictions[r_type] = {}
-        if (
-            code in self.restrictions[r_type]
-            and self.restrictions[r_type][code] != name
-        ):
+        name = name.strip()
+        restrictions = self.restrictions.setdefault(r_type, {})
+        existing_name = restrictions.get(code)
+        if existing_name is not None and existing_name != name:
             logger.warning(
                 f"Conflicting restriction name for type {r_type} code {code}: "
-                f"'{self.restrictions[r_type][code]}' vs '{name}'"
+                f"'{existing_name}' vs '{name}'"
             )
         # Update code to name mapping regardless of whether a conflict exists
-        self.restrictions[r_type][code] = name.strip()
+        restrictions[code] = name
 
     def add_instructor(self, rcsid: str, name: str, email: str) -> None:
         """
@@ -190,15 +225,17 @@ class CodeMapper:
         @param name: Instructor name to add.
         @param email: Instructor email to add.
         """
-        if rcsid in self.instructors and self.instructors[rcsid] != (name, email):
+        instructor_data = (name, email)
+        existing_data = self.instructors.setdefault(rcsid, instructor_data)
+        if existing_data != instructor_data:
             logger.warning(
                 f"Conflicting data for RCSID {rcsid}: "
-                f"existing name '{self.instructors[rcsid][0]}', "
-                f"email '{self.instructors[rcsid][1]}' vs. "
+                f"existing name '{existing_data[0]}', "
+                f"email '{existing_data[1]}' vs. "
                 f"new name '{name}', email '{email}'; overriding old data"
             )
-        # Update RCSID to name mapping regardless of whether a conflict exists
-        self.instructors[rcsid] = (name, email)
+            # Override the existing data to ensure the most recent data is used
+            self.instructors[rcsid] = instructor_data
 
     def add_generated_instructor(self, rcsid: str, name: str, email: str) -> None:
         """
@@ -211,17 +248,17 @@ class CodeMapper:
         @param name: Generated instructor name to add.
         @param email: Generated instructor email to add.
         """
-        if rcsid in self.generated_instructors and self.generated_instructors[
-            rcsid
-        ] != (name, email):
+        instructor_data = (name, email)
+        existing_data = self.generated_instructors.setdefault(rcsid, instructor_data)
+        if existing_data != instructor_data:
             logger.warning(
                 f"Conflicting data for generated RCSID {rcsid}: "
-                f"existing name '{self.generated_instructors[rcsid][0]}', "
-                f"email '{self.generated_instructors[rcsid][1]}' vs. "
+                f"existing name '{existing_data[0]}', "
+                f"email '{existing_data[1]}' vs. "
                 f"new name '{name}', email '{email}'; overriding old data"
             )
-        # Update RCSID to name mapping regardless of whether a conflict exists
-        self.generated_instructors[rcsid] = (name, email)
+            # Override the existing data to ensure the most recent data is used
+            self.generated_instructors[rcsid] = instructor_data
         # Update reverse mapping
         self.generated_instructor_name_to_rcsid[name] = rcsid
 
@@ -233,9 +270,7 @@ class CodeMapper:
         @param name: Subject name to look up.
         @return: Subject code corresponding to the given name, or None if not found.
         """
-        if name in self.subject_name_to_code:
-            return self.subject_name_to_code[name]
-        return None
+        return self.subject_name_to_code.get(name)
 
     def get_generated_rcsid(self, name: str) -> str | None:
         """
@@ -246,9 +281,7 @@ class CodeMapper:
         @return: Generated instructor RCSID corresponding to the given name, or None if \
             not found.
         """
-        if name in self.generated_instructor_name_to_rcsid:
-            return self.generated_instructor_name_to_rcsid[name]
-        return None
+        return self.generated_instructor_name_to_rcsid.get(name)
 
     def generate_rcsid(self, instructor_name: str) -> str:
         """
@@ -267,7 +300,7 @@ class CodeMapper:
         if len(instructor_name_split) < 2:
             logger.warning(f"Unexpected instructor name format: {instructor_name}")
             # As a fallback, remove spaces and lowercase the name
-            return re.sub(r"\s+", "", instructor_name).lower()[:8]
+            return _WHITESPACE_RE.sub("", instructor_name).lower()[:8]
         # Some names may have commas in them
         last_name = instructor_name_split[0].strip(",")
         last_name_component = ""
@@ -295,6 +328,57 @@ class CodeMapper:
         return rcsid
 
 
+def _parse_attribute(attribute: str) -> tuple[str, str] | None:
+    """
+    Splits an attribute in the format "Name  Code" (two spaces) into its name and code.
+
+    @param attribute: Attribute string from a class entry in the raw course data.
+    @return: Tuple of (name, code), or None if the attribute is not in the expected
+        format.
+    """
+    # Nearly all attributes split at their last double space, which avoids running
+    # the regex
+    name, separator, code = attribute.rpartition("  ")
+    if separator and name and code:
+        return name, code
+    # Fall back to the regex for unusual spacing, e.g. a trailing double space
+    match = _ATTRIBUTE_RE.match(attribute)
+    if match:
+        return match.group(1), match.group(2)
+    return None
+
+
+def _get_faculty_rcsid(faculty: dict[str, Any], mapper: CodeMapper) -> str | None:
+    """
+    Gets the RCSID of a faculty member of a class, adding the faculty member to the
+    provided CodeMapper. Faculty members without an email address are given a
+    generated RCSID based on their name.
+
+    @param faculty: Faculty member data from a class entry in the raw course data.
+    @param mapper: CodeMapper instance to use for managing code mappings and lookups.
+    @return: The RCSID of the faculty member, or None if it could not be determined.
+    """
+    name = faculty["displayName"]
+    email = faculty["emailAddress"]
+    rcsid = None
+    # Either displayName or emailAddress will be present
+    if email:
+        # Nearly all instructor emails are RPI addresses, whose suffix can be sliced off
+        if email.endswith(_RPI_EMAIL_SUFFIX):
+            rcsid = email[: -len(_RPI_EMAIL_SUFFIX)].lower()
+        else:
+            rcsid = email.partition("@")[0].lower()
+    if not rcsid and name:
+        # Check if generated RCSID exists for this name
+        rcsid = mapper.get_generated_rcsid(name)
+        if not rcsid:
+            rcsid = mapper.generate_rcsid(name)
+            mapper.add_generated_instructor(rcsid, name, email)
+    elif rcsid and name:
+        mapper.add_instructor(rcsid, name, email)
+    return rcsid
+
+
 def process_term(term: str, term_data: dict[str, Any], mapper: CodeMapper) -> None:
     """
     Processes the course data for a single term, codifying subject codes, attribute codes,
@@ -318,22 +402,22 @@ def process_term(term: str, term_data: dict[str, Any], mapper: CodeMapper) -> No
             )
             continue
 
-        for _, class_list in subject_data["courses"].items():
+        for class_list in subject_data["courses"].values():
             for class_entry in class_list:
+                crn = class_entry["courseReferenceNumber"]
                 # Attributes
                 if "attributes" in class_entry:
                     new_attributes = []
                     for attr in class_entry["attributes"]:
-                        # Parse "Name  Code" (two spaces)
-                        match = re.match(r"(.+)  (.+)", attr)
-                        if match:
-                            name, code = match.groups()
+                        parsed = _parse_attribute(attr)
+                        if parsed is not None:
+                            name, code = parsed
                             mapper.add_attribute(code, name.strip())
                             new_attributes.append(code)
                         else:
                             logger.warning(
                                 f"Unexpected attribute format: '{attr}' "
-                                f"for CRN {class_entry['courseReferenceNumber']} "
+                                f"for CRN {crn} "
                                 f"in term {term}"
                             )
                             new_attributes.append(attr)
@@ -341,48 +425,32 @@ def process_term(term: str, term_data: dict[str, Any], mapper: CodeMapper) -> No
 
                 # Restrictions
                 if "restrictions" in class_entry:
-                    for r_type, r_list in class_entry["restrictions"].items():
+                    restrictions = class_entry["restrictions"]
+                    for r_type, r_list in restrictions.items():
                         if r_type == "special_approval":
                             continue
                         new_r_list = []
                         for restriction in r_list:
                             # Parse "Name (Code)"
-                            match = re.match(r"(.+)\s*\((.+)\)", restriction)
+                            match = _RESTRICTION_RE.match(restriction)
                             if match:
                                 name, code = match.groups()
                                 mapper.add_restriction(r_type, code, name.strip())
                                 new_r_list.append(code)
                             else:
                                 new_r_list.append(restriction)
-                        class_entry["restrictions"][r_type] = new_r_list
+                        restrictions[r_type] = new_r_list
 
                 # Faculty
                 if "faculty" in class_entry:
-                    processed_faculty = []
-                    for faculty in class_entry["faculty"]:
-                        name = faculty["displayName"]
-                        email = faculty["emailAddress"]
-                        rcsid = None
-                        # Either displayName or emailAddress will be present
-                        if email:
-                            rcsid = email.split("@")[0].lower()
-                        if not rcsid and name:
-                            # Check if generated RCSID exists for this name
-                            rcsid = mapper.get_generated_rcsid(name)
-                            if not rcsid:
-                                rcsid = mapper.generate_rcsid(name)
-                                mapper.add_generated_instructor(rcsid, name, email)
-                        elif rcsid and name:
-                            mapper.add_instructor(rcsid, name, email)
-                        processed_faculty.append(
-                            {
-                                "rcsid": rcsid,
-                                "allMeetings": faculty["allMeetings"],
-                                "primaryMeetings": faculty["primaryMeetings"],
-                            }
-                        )
-
-                    class_entry["faculty"] = processed_faculty
+                    class_entry["faculty"] = [
+                        {
+                            "rcsid": _get_faculty_rcsid(faculty, mapper),
+                            "allMeetings": faculty["allMeetings"],
+                            "primaryMeetings": faculty["primaryMeetings"],
+                        }
+                        for faculty in class_entry["faculty"]
+                    ]
 
                 # Crosslists & Corequisites
                 for field in ["crosslists", "corequisites"]:
@@ -396,8 +464,7 @@ def process_term(term: str, term_data: dict[str, Any], mapper: CodeMapper) -> No
                             if subj_code is None:
                                 logger.warning(
                                     f"Subject name '{subj_name}' not found in mapping "
-                                    f"for CRN {class_entry['courseReferenceNumber']} "
-                                    f"in term {term}"
+                                    f"for CRN {crn} in term {term}"
                                 )
                                 subj_code = subj_name
                             new_list.append(f"{subj_code} {course_num}")
@@ -465,18 +532,19 @@ def main(
         # Process each term course data file
         for term_file in output_data_dir.glob("*.json"):
             try:
-                with term_file.open("r", encoding="utf-8") as f:
-                    term_course_data = json.load(f)
+                term_course_data = orjson.loads(term_file.read_bytes())
                 process_term(term_file.stem, term_course_data, mapper)
                 # Write processed data
                 processed_file_path = processed_output_data_dir / term_file.name
-                with processed_file_path.open("w", encoding="utf-8") as f:
-                    logger.info(f"Writing processed data to {processed_file_path}")
-                    json.dump(term_course_data, f, indent=4, ensure_ascii=False)
+                logger.info(f"Writing processed data to {processed_file_path}")
+                # Indented by 2 spaces, since orjson doesn't support 4-space indentation
+                # like the json module used by earlier versions
+                processed_file_path.write_bytes(
+                    orjson.dumps(term_course_data, option=orjson.OPT_INDENT_2)
+                )
             except Exception as e:
-                logger.error(
+                logger.exception(
                     f"Error processing term data from {term_file}, aborting term: {e}"
-                    f"\n{traceback.format_exc()}"
                 )
 
         # Save updated mappings
@@ -510,7 +578,7 @@ def main(
         mapper.save()
 
     except Exception as e:
-        logger.fatal(f"Error during postprocessing: {e}\n{traceback.format_exc()}")
+        logger.fatal(f"Error during postprocessing: {e}", exc_info=True)
         return False
 
     return True
@@ -1,13 +1,19 @@
 import asyncio
 import html
-import json
 import logging
+import random
 import re
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from enum import Enum
 from typing import Any
 
 import aiohttp
 import bs4
+import ijson
+import orjson
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -34,9 +40,49 @@ _RESTRICTION_TYPE_MAP = {
     "Special Approvals": "special_approval",
 }
 
+# Maps the ("Must" | "Cannot", restriction type) groups of a restriction header to the
+# key of its list in the restrictions data, e.g. ("Cannot", "Majors") -> "not_major"
+_RESTRICTION_KEY_MAP = {
+    (must_or_cannot, type_plural): (
+        f"not_{key_base}" if must_or_cannot == "Cannot" else key_base
+    )
+    for type_plural, key_base in _RESTRICTION_TYPE_MAP.items()
+    for must_or_cannot in ("Must", "Cannot")
+}
+
+# Matches restriction headers such as "Must be enrolled in one of the following Majors:"
+_RESTRICTION_HEADER_RE = re.compile(
+    r"(Must|Cannot) be enrolled in one of the following "
+    f"({'|'.join(re.escape(key) for key in _RESTRICTION_TYPE_MAP)}):"
+)
+# "Special Approvals:" is the only other known restriction header pattern
+_SPECIAL_APPROVALS_RE = re.compile(r"Special Approvals:")
+# Every restriction header starts with one of these, so anything else can be rejected
+# without running the header patterns
+_RESTRICTION_HEADER_PREFIXES = ("Must ", "Cannot ", "Special Approvals:")
+# Matches a restriction item whose parenthesized code has been closed
+_PAREN_CLOSED_RE = re.compile(r".*\(.*\)")
+
+# Version of the output format of the class detail parsers. Bump this whenever a
+# parser's output changes, so that results cached by older parsers are not reused.
+DETAIL_PARSER_VERSION = 1
+
 # Base URL for all SIS class registration API endpoints
 _BASE_URL = "https://sis9.rpi.edu/StudentRegistrationSsb/ssb/"
 
+# Headers sent with every request. aiohttp transparently decompresses responses in any
+# of these encodings; "br" requires the Brotli package.
+_REQUEST_HEADERS = {"Accept-Encoding": "gzip, deflate, br"}
+
+# Connection pool settings for sessions created by sis_session()
+_SESSION_CONNECTION_LIMIT = 64
+_SESSION_CONNECTION_LIMIT_PER_HOST = 32
+_SESSION_DNS_CACHE_TTL = 600
+
+# Maximum number of attempts for each request, and the exceptions that trigger a retry
+_MAX_REQUEST_ATTEMPTS = 3
+_RETRY_EXCEPTIONS = (asyncio.TimeoutError, aiohttp.ClientError)
+
 
 class ClassColumn(str, Enum):
     """
@@ -54,18 +100,55 @@ class ClassColumn(str, Enum):
 
 def html_unescape(obj: Any) -> Any:
     """
-    Recursively unescape HTML entities in all string values within a complex
-    structure (dicts, lists, tuples, sets). Dictionary keys are unescaped too.
+    Unescape HTML entities in all string values within a complex structure (dicts,
+    lists, tuples, sets). Dictionary keys are unescaped too.
+
+    Nested dicts and lists are walked iteratively with an explicit stack and updated in
+    place rather than rebuilt, so unescaping a large parsed JSON response neither
+    recurses per container nor allocates a second copy of it. A dict is only rebuilt
+    if one of its keys contains an entity, to preserve key order.
 
     @param obj: The object to unescape, which can be a string, dict, list, tuple, etc.
     @return: The same object with all string values unescaped.
     """
+    obj = _unescape_node(obj)
+    if not isinstance(obj, (dict, list)):
+        return obj
+    stack = deque([obj])
+    while stack:
+        container = stack.pop()
+        items = (
+            container.items() if isinstance(container, dict) else enumerate(container)
+        )
+        for k, v in items:
+            # Strings are by far the most common values, so check for them first
+            if type(v) is str:
+                container[k] = html.unescape(v)
+                continue
+            node = _unescape_node(v)
+            if node is not v:
+                container[k] = node
+            if isinstance(node, (dict, list)):
+                stack.append(node)
+    return obj
+
+
+def _unescape_node(obj: Any) -> Any:
+    """
+    Unescapes a single value for html_unescape(). Strings are unescaped, dicts have
+    their keys unescaped, and tuples and sets are rebuilt with unescaped items. The
+    values of dicts and lists are left for the caller to walk.
+
+    @param obj: The value to unescape.
+    @return: The unescaped value, which is the same object for lists, dicts without
+        escaped keys, and non-container values.
+    """
     if isinstance(obj, str):
         return html.unescape(obj)
     if isinstance(obj, dict):
-        return {html_unescape(k): html_unescape(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [html_unescape(i) for i in obj]
+        if any(isinstance(k, str) and "&" in k for k in obj):
+            return {_unescape_node(k): v for k, v in obj.items()}
+        return obj
     if isinstance(obj, tuple):
         return tuple(html_unescape(i) for i in obj)
     if isinstance(obj, set):
@@ -73,10 +156,31 @@ def html_unescape(obj: Any) -> Any:
     return obj
 
 
-@retry(
-    stop=stop_after_attempt(3),
+def parse_json(raw_data: bytes) -> Any:
+    """
+    Parses a JSON response from SIS and unescapes HTML entities in all of its string
+    values.
+
+    The response body is parsed directly from bytes, without first decoding it to a
+    string. Many SIS responses contain no HTML entities at all, in which case the
+    unescape walk over the parsed data is skipped entirely. Every HTML entity starts
+    with an ampersand, which appears in the raw JSON either as is or as a \\u0026
+    escape.
+
+    @param raw_data: The raw JSON response body to parse.
+    @return: The parsed and unescaped JSON data.
+    """
+    data = orjson.loads(raw_data)
+    if b"&" in raw_data or b"\\u0026" in raw_data:
+        data = html_unescape(data)
+    return data
+
+
+# Retries a failed request up to 3 times using exponential backoff and jitter
+_retry_request = retry(
+    stop=stop_after_attempt(_MAX_REQUEST_ATTEMPTS),
     wait=wait_random_exponential(multiplier=1.5) + wait_random(min=0, max=2),
-    retry=retry_if_exception_type((asyncio.TimeoutError, aiohttp.ClientError)),
+    retry=retry_if_exception_type(_RETRY_EXCEPTIONS),
     before_sleep=lambda retry_state: logger.warning(
         f"Retrying failed request (attempt {retry_state.attempt_number}) "
         f"for URL: {getattr(retry_state.args[1], 'url', retry_state.args[1])} "
@@ -88,6 +192,9 @@ def html_unescape(obj: Any) -> Any:
         )}"
     ),
 )
+
+
+@_retry_request
 async def retry_get(
     session: aiohttp.ClientSession, url: str, params: dict[str, Any]
 ) -> Any:
@@ -96,17 +203,135 @@ async def retry_get(
     response, retrying up to 3 times on failure using exponential backoff and
     jitter.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    Responses are requested compressed and decompressed transparently by aiohttp. The
+    session should be reused across calls so that its connector can keep connections
+    to SIS alive between requests.
+
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param url: The URL to send the GET request to.
     @param params: A dictionary of query parameters to include in the request.
     @return: The raw text response from the server.
     """
-    async with session.get(url, params=params) as response:
+    async with session.get(url, params=params, headers=_REQUEST_HEADERS) as response:
         response.raise_for_status()
         raw_data = await response.text()
     return raw_data
 
 
+@_retry_request
+async def retry_get_bytes(
+    session: aiohttp.ClientSession, url: str, params: dict[str, Any]
+) -> bytes:
+    """
+    Helper function to perform an HTTP GET request and return the raw response
+    body without decoding it, retrying up to 3 times on failure using exponential
+    backoff and jitter.
+
+    Used for JSON and HTML responses, which the parsers can read from bytes directly.
+
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
+    @param url: The URL to send the GET request to.
+    @param params: A dictionary of query parameters to include in the request.
+    @return: The raw response body from the server.
+    """
+    async with session.get(url, params=params, headers=_REQUEST_HEADERS) as response:
+        response.raise_for_status()
+        raw_data = await response.read()
+    return raw_data
+
+
+@_retry_request
+async def retry_get_bytes_with_etag(
+    session: aiohttp.ClientSession, url: str, params: dict[str, Any]
+) -> tuple[bytes, str | None]:
+    """
+    Helper function to perform an HTTP GET request and return the raw response body
+    along with the response's ETag, retrying up to 3 times on failure using exponential
+    backoff and jitter.
+
+    @param session: An aiohttp ClientSession to use for the request.
+    @param url: The URL to send the GET request to.
+    @param params: A dictionary of query parameters to include in the request.
+    @return: A tuple of (raw response body, ETag), where the ETag is None if the server
+        doesn't send one.
+    """
+    async with session.get(url, params=params, headers=_REQUEST_HEADERS) as response:
+        response.raise_for_status()
+        raw_data = await response.read()
+        return raw_data, response.headers.get("ETag")
+
+
+@_retry_request
+async def retry_get_etag(
+    session: aiohttp.ClientSession,
+    url: str,
+    params: dict[str, Any],
+    etag: str | None = None,
+) -> str | None:
+    """
+    Helper function to perform a conditional HTTP GET request and return the ETag of
+    the response, retrying up to 3 times on failure using exponential backoff and
+    jitter. The response body is not read if the resource is unchanged.
+
+    @param session: An aiohttp ClientSession to use for the request.
+    @param url: The URL to send the GET request to.
+    @param params: A dictionary of query parameters to include in the request.
+    @param etag: Optional ETag from a previous response, sent as If-None-Match.
+    @return: The current ETag of the resource, which equals etag if the server reports
+        it as not modified, or None if the server doesn't send one.
+    """
+    headers = _REQUEST_HEADERS
+    if etag is not None:
+        headers = {**_REQUEST_HEADERS, "If-None-Match": etag}
+    async with session.get(url, params=params, headers=headers) as response:
+        if response.status == 304:
+            return etag
+        response.raise_for_status()
+        return response.headers.get("ETag")
+
+
+@asynccontextmanager
+async def sis_session(
+    tcp_connector: aiohttp.TCPConnector | None = None,
+    timeout: int = 60,
+    cookie_jar: aiohttp.abc.AbstractCookieJar | None = None,
+) -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Opens a client session configured for making requests to SIS.
+
+    A single session should be reused for all requests rather than opening one per
+    call, since every new connection costs a DNS lookup, TCP handshake, and TLS
+    handshake. Sessions that need separate server-side state (e.g. concurrent class
+    searches) can still share one connection pool by passing the same connector.
+
+    @param tcp_connector: Optional TCP connector to share between sessions. The
+        connector is not closed with the session. If not provided, the session creates
+        and owns a pooled connector with DNS caching.
+    @param timeout: Timeout in seconds for all requests made by the session.
+    @param cookie_jar: Optional cookie jar for the session, e.g. aiohttp.DummyCookieJar
+        for a session that only makes stateless requests. If not provided, the session
+        stores cookies in its own jar.
+    @return: An async context manager yielding the client session.
+    """
+    connector_owner = tcp_connector is None
+    if tcp_connector is None:
+        tcp_connector = aiohttp.TCPConnector(
+            limit=_SESSION_CONNECTION_LIMIT,
+            limit_per_host=_SESSION_CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=_SESSION_DNS_CACHE_TTL,
+            force_close=False,
+        )
+    async with aiohttp.ClientSession(
+        connector=tcp_connector,
+        connector_owner=connector_owner,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        cookie_jar=cookie_jar,
+    ) as session:
+        yield session
+
+
 async def get_term_subjects(
     session: aiohttp.ClientSession, term: str
 ) -> list[dict[str, str]]:
@@ -114,7 +339,8 @@ async def get_term_subjects(
     Fetches the list of subjects and codes for a given term from SIS. If the
     term is invalid or doesn't exist, returns an empty list.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code to fetch subjects for (e.g. "202409" for Fall 2024).
     @return: A list of dictionaries in the following format:
     ```
@@ -127,12 +353,46 @@ async def get_term_subjects(
     ]
     ```
     """
+    subjects, _ = await get_term_subjects_with_etag(session, term)
+    return subjects
+
+
+async def get_term_subjects_with_etag(
+    session: aiohttp.ClientSession, term: str
+) -> tuple[list[dict[str, str]], str | None]:
+    """
+    Fetches the list of subjects and codes for a given term from SIS along with the
+    list's ETag, so that the ETag recorded for a scrape matches the subjects it used.
+
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
+    @param term: The term code to fetch subjects for (e.g. "202409" for Fall 2024).
+    @return: A tuple of (subjects, ETag). Subjects are in the same format as returned
+        by get_term_subjects(), and the ETag is None if SIS doesn't provide one.
+    """
     url = _BASE_URL + "classSearch/get_subject"
     params = {"term": term, "offset": 1, "max": 2147483647}
-    raw_data = raw_data = await retry_get(session, url, params)
-    data = json.loads(raw_data)
-    data = html_unescape(data)
-    return data
+    raw_data, etag = await retry_get_bytes_with_etag(session, url, params)
+    return parse_json(raw_data), etag
+
+
+async def get_term_subjects_etag(
+    session: aiohttp.ClientSession, term: str, etag: str | None = None
+) -> str | None:
+    """
+    Fetches the ETag of the list of subjects for a given term from SIS, which can be
+    used to check whether the term has changed since a previous scrape.
+
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
+    @param term: The term code to fetch the subject list ETag for.
+    @param etag: Optional ETag from a previous call, to make the request conditional.
+    @return: The current ETag of the subject list, which equals etag if the list has
+        not changed, or None if SIS doesn't provide one.
+    """
+    url = _BASE_URL + "classSearch/get_subject"
+    params = {"term": term, "offset": 1, "max": 2147483647}
+    return await retry_get_etag(session, url, params, etag)
 
 
 async def get_term_instructors(
@@ -142,7 +402,8 @@ async def get_term_instructors(
     Fetches the list of instructors for a given term from SIS. If the term is
     invalid or doesn't exist, returns an empty list.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code to fetch instructors for (e.g. "202409" for Fall 2024).
     @return: A list of dictionaries in the following format:
     ```
@@ -157,9 +418,8 @@ async def get_term_instructors(
     """
     url = _BASE_URL + "classSearch/get_instructor"
     params = {"term": term, "offset": 1, "max": 2147483647}
-    raw_data = await retry_get(session, url, params)
-    data = json.loads(raw_data)
-    data = html_unescape(data)
+    raw_data = await retry_get_bytes(session, url, params)
+    data = parse_json(raw_data)
     return data
 
 
@@ -173,7 +433,8 @@ async def get_all_attributes(
     by courses. For example, "FRSH" and "ONLI" are known attributes that are
     missing from this list.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param search_term: An optional search term to filter the attributes.
     @return: A list of dictionaries in the following format:
     ```
@@ -188,9 +449,8 @@ async def get_all_attributes(
     """
     url = _BASE_URL + "classSearch/get_attribute"
     params = {"searchTerm": search_term, "offset": 1, "max": 2147483647}
-    raw_data = await retry_get(session, url, params)
-    data = json.loads(raw_data)
-    data = html_unescape(data)
+    raw_data = await retry_get_bytes(session, url, params)
+    data = parse_json(raw_data)
     return data
 
 
@@ -201,7 +461,8 @@ async def get_all_colleges(
     Fetches the master list of colleges (schools) and codes from SIS. Not to be
     confused with campuses.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param search_term: An optional search term to filter the colleges.
     @return: A list of dictionaries in the following format:
     ```
@@ -216,9 +477,8 @@ async def get_all_colleges(
     """
     url = _BASE_URL + "classSearch/get_college"
     params = {"searchTerm": search_term, "offset": 1, "max": 2147483647}
-    raw_data = await retry_get(session, url, params)
-    data = json.loads(raw_data)
-    data = html_unescape(data)
+    raw_data = await retry_get_bytes(session, url, params)
+    data = parse_json(raw_data)
     return data
 
 
@@ -229,7 +489,8 @@ async def get_all_campuses(
     Fetches the master list of campuses and codes from SIS. Not to be confused
     with colleges (schools).
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param search_term: An optional search term to filter the campuses.
     @return: A list of dictionaries in the following format:
     ```
@@ -244,9 +505,8 @@ async def get_all_campuses(
     """
     url = _BASE_URL + "classSearch/get_campus"
     params = {"searchTerm": search_term}
-    raw_data = await retry_get(session, url, params)
-    data = json.loads(raw_data)
-    data = html_unescape(data)
+    raw_data = await retry_get_bytes(session, url, params)
+    data = parse_json(raw_data)
     return data
 
 
@@ -259,7 +519,8 @@ async def reset_class_search(session: aiohttp.ClientSession, term: str) -> None:
     from the last subject accessed, or no data if attempting to access data
     from a different term.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code to reset the search state for.
     """
     url = _BASE_URL + "term/search"
@@ -279,9 +540,11 @@ async def class_search(
     Fetches the list of classes for a given subject and term from SIS.
 
     The term and subject search state on the SIS server must be reset before
-    each call to this function.
+    each call to this function. To process classes as they arrive instead of
+    waiting for the whole list, use iter_class_search().
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code to search within.
     @param subject: The subject code to search for.
     @param max_size: Maximum number of results to return.
@@ -290,6 +553,46 @@ async def class_search(
     @return: A list of class dictionaries. Returned data format is very large;
         see the repository README for details.
     """
+    return [
+        class_entry
+        async for class_entry in iter_class_search(
+            session, term, subject, max_size, sort_column, sort_asc
+        )
+    ]
+
+
+async def iter_class_search(
+    session: aiohttp.ClientSession,
+    term: str,
+    subject: str,
+    max_size: int = 2147483647,
+    sort_column: ClassColumn = ClassColumn.SUBJECT_DESCRIPTION,
+    sort_asc: bool = True,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Streams the list of classes for a given subject and term from SIS, yielding each
+    class as soon as it has been parsed from the response body instead of buffering
+    and parsing the whole response at once.
+
+    The term and subject search state on the SIS server must be reset before
+    each call to this function.
+
+    Requests that fail before any class has been yielded are retried up to 3 times
+    using exponential backoff and jitter, like retry_get(), resetting the search state
+    before each retry. A request that fails after classes have been yielded is not
+    retried, since SIS doesn't guarantee the order of classes with equal sort values
+    and a resumed response could duplicate or drop classes. The error is raised instead,
+    so that the caller can restart the subject from scratch.
+
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
+    @param term: The term code to search within.
+    @param subject: The subject code to search for.
+    @param max_size: Maximum number of results to return.
+    @param sort_column: The column to sort results by.
+    @param sort_asc: Whether to sort ascending (True) or descending (False).
+    @return: An async iterator of class dictionaries. See class_search().
+    """
     url = _BASE_URL + "searchResults/searchResults"
     params = {
         "pageOffset": 0,
@@ -299,13 +602,32 @@ async def class_search(
         "sortColumn": sort_column,
         "sortDirection": "asc" if sort_asc else "desc",
     }
-    raw_data = await retry_get(session, url, params)
-    data = json.loads(raw_data)
-    data = html_unescape(data)
-    course_data = data["data"]
-    if course_data is None:
-        return []
-    return course_data
+    has_yielded = False
+    for attempt in range(1, _MAX_REQUEST_ATTEMPTS + 1):
+        try:
+            async with session.get(
+                url, params=params, headers=_REQUEST_HEADERS
+            ) as response:
+                response.raise_for_status()
+                # A null "data" value yields no items, same as an empty list
+                class_entries = ijson.items_async(
+                    response.content, "data.item", use_float=True
+                )
+                async for class_entry in class_entries:
+                    has_yielded = True
+                    yield html_unescape(class_entry)
+            return
+        except _RETRY_EXCEPTIONS as e:
+            if has_yielded or attempt == _MAX_REQUEST_ATTEMPTS:
+                raise
+            logger.warning(
+                f"Retrying failed request (attempt {attempt}) for URL: {url} "
+                f"with params: {params} | Exception: {repr(e)}"
+            )
+            await asyncio.sleep(
+                random.uniform(0, 1.5 * 2 ** (attempt - 1)) + random.uniform(0, 2)
+            )
+            await reset_class_search(session, term)
 
 
 async def get_class_details(
@@ -314,7 +636,8 @@ async def get_class_details(
     """
     Fetches and parses data from the "Details" tab of a class details page.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code of the class.
     @param crn: The course reference number of the class.
     @return: A dictionary in the following format:
@@ -332,15 +655,16 @@ async def get_class_details(
     """
     url = _BASE_URL + "searchResults/getClassDetails"
     params = {"term": term, "courseReferenceNumber": crn}
-    raw_data = await retry_get(session, url, params)
-    raw_data = html_unescape(raw_data)
-    soup = bs4.BeautifulSoup(raw_data, "html5lib")
+    raw_data = await retry_get_bytes(session, url, params)
+    soup = bs4.BeautifulSoup(raw_data, "lxml", from_encoding="utf-8")
     details_tag = soup.find("section", {"aria-labelledby": "classDetails"})
     crn = details_tag.find("span", {"id": "courseReferenceNumber"}).text.strip()
     section_num = details_tag.find("span", {"id": "sectionNumber"}).text.strip()
     subj_name = details_tag.find("span", {"id": "subject"}).text.strip()
+    subj_name = html.unescape(subj_name)
     course_num = details_tag.find("span", {"id": "courseDisplay"}).text.strip()
     title = details_tag.find("span", {"id": "courseTitle"}).text.strip()
+    title = html.unescape(title)
     # Only courses with a credit range have a span with id "credit-hours-discretion",
     # otherwise the credit hours span follows a span with text "Credit Hours:".
     credit_min, credit_max = None, None
@@ -367,7 +691,8 @@ async def get_class_description(
     Fetches and parses data from the "Course Description" tab of a class
     details page.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code of the class.
     @param crn: The course reference number of the class.
     @return: A string containing the course description, without any additional fields
@@ -375,19 +700,19 @@ async def get_class_description(
     """
     url = _BASE_URL + "searchResults/getCourseDescription"
     params = {"term": term, "courseReferenceNumber": crn}
-    raw_data = await retry_get(session, url, params)
-    raw_data = html_unescape(raw_data)
-    soup = bs4.BeautifulSoup(raw_data, "html5lib")
+    raw_data = await retry_get_bytes(session, url, params)
+    soup = bs4.BeautifulSoup(raw_data, "lxml", from_encoding="utf-8")
     description_tag = soup.find("section", {"aria-labelledby": "courseDescription"})
     if description_tag is None:
         logger.warning(f"No description found for term and CRN: {term} - {crn}")
         return ""
-    description_text_list = [
-        text.strip() for text in description_tag.get_text(separator="\n").split("\n")
-    ]
-    for text in description_text_list:
-        if text != "":
-            return text
+    # Return the first non-empty line of text, stopping at the first text node that
+    # contains one rather than extracting and splitting all of the section's text
+    for text in description_tag.strings:
+        for line in text.split("\n"):
+            line = line.strip()
+            if line != "":
+                return html.unescape(line)
     return ""
 
 
@@ -397,7 +722,8 @@ async def get_class_enrollment(
     """
     Fetches and parses data from the "Enrollment/Waitlist" tab of a class details page.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code of the class.
     @param crn: The course reference number of the class.
     @return: A dictionary in the following format:
@@ -414,9 +740,8 @@ async def get_class_enrollment(
     """
     url = _BASE_URL + "searchResults/getEnrollmentInfo"
     params = {"term": term, "courseReferenceNumber": crn}
-    raw_data = await retry_get(session, url, params)
-    raw_data = html_unescape(raw_data)
-    soup = bs4.BeautifulSoup(raw_data, "html5lib")
+    raw_data = await retry_get_bytes(session, url, params)
+    soup = bs4.BeautifulSoup(raw_data, "lxml", from_encoding="utf-8")
     enrollment_tag = soup.find("section", {"aria-labelledby": "enrollmentInfo"})
     # There are no relevant classes or ids on the spans, so we have to rely on the text
     # content of the preceding <span> tags.
@@ -445,7 +770,8 @@ async def get_class_attributes(
     """
     Fetches and parses data from the "Attributes" tab of a class details page.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code of the class.
     @param crn: The course reference number of the class.
     @return: A list of strings in the following format:
@@ -460,14 +786,26 @@ async def get_class_attributes(
     """
     url = _BASE_URL + "searchResults/getSectionAttributes"
     params = {"term": term, "courseReferenceNumber": crn}
-    raw_data = await retry_get(session, url, params)
-    raw_data = html_unescape(raw_data)
-    soup = bs4.BeautifulSoup(raw_data, "html5lib")
-    attributes = []
-    attribute_tags = soup.find_all("span", {"class": "attribute-text"})
-    for tag in attribute_tags:
-        attributes.append(tag.text.strip())
-    return attributes
+    raw_data = await retry_get_bytes(session, url, params)
+    tree = LexborHTMLParser(raw_data)
+    return [
+        html.unescape(node.text().strip()) for node in tree.css("span.attribute-text")
+    ]
+
+
+def parse_section_attributes(section_attributes: list[dict[str, Any]]) -> list[str]:
+    """
+    Converts the "sectionAttributes" field of a class search result into the same
+    format returned by get_class_attributes(), avoiding a separate request for the
+    "Attributes" tab of the class details page.
+
+    @param section_attributes: The "sectionAttributes" list of a class search result.
+    @return: A list of strings in the format "Communication Intensive  COMM".
+    """
+    return [
+        f"{attribute['description'].strip()}  {attribute['code'].strip()}"
+        for attribute in section_attributes
+    ]
 
 
 async def get_class_restrictions(session: aiohttp.ClientSession, term: str, crn: str):
@@ -475,7 +813,8 @@ async def get_class_restrictions(session: aiohttp.ClientSession, term: str, crn:
     Fetches and parses data from the "Restrictions" tab of a class details
     page.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code of the class.
     @param crn: The course reference number of the class.
     @return: A dictionary in the following format:
@@ -503,9 +842,8 @@ async def get_class_restrictions(session: aiohttp.ClientSession, term: str, crn:
     """
     url = _BASE_URL + "searchResults/getRestrictions"
     params = {"term": term, "courseReferenceNumber": crn}
-    raw_data = await retry_get(session, url, params)
-    raw_data = html_unescape(raw_data)
-    soup = bs4.BeautifulSoup(raw_data, "html5lib")
+    raw_data = await retry_get_bytes(session, url, params)
+    tree = LexborHTMLParser(raw_data)
     # Dynamically build dict structure from RESTRICTION_TYPE_MAP values
     restrictions_data = {}
     bases = set(_RESTRICTION_TYPE_MAP.values())
@@ -515,35 +853,30 @@ async def get_class_restrictions(session: aiohttp.ClientSession, term: str, crn:
         if base == "special_approval":
             continue
         restrictions_data[f"not_{base}"] = []
-    restrictions_tag = soup.find("section", {"aria-labelledby": "restrictions"})
-    escaped_keys = [re.escape(key) for key in _RESTRICTION_TYPE_MAP.keys()]
-    restriction_header_pattern = (
-        r"(Must|Cannot) be enrolled in one of the following "
-        f"({'|'.join(escaped_keys)}):"
-    )
-    # "Special Approvals:" is the only other known header pattern
-    special_approvals_pattern = r"Special Approvals:"
     # All known children of the restrictions section are <div>, <span<>, or <br> tags
-    # Tags relevant to restrictions are only known to be <span> tags
+    # Tags relevant to restrictions are only known to be <span> tags, so the strings of
+    # all child <span> tags are collected in one pass and parsed as a flat list
     restrictions_content = [
-        child
-        for child in restrictions_tag.children
-        if isinstance(child, bs4.element.Tag) and child.name == "span"
+        _node_string(node)
+        for node in tree.css('section[aria-labelledby="restrictions"] > span')
     ]
+    # Bind names used in the loops below to locals to avoid repeated lookups
+    num_contents = len(restrictions_content)
+    match_header = _match_restriction_header
+    match_paren_closed = _PAREN_CLOSED_RE.match
+    special_approvals = restrictions_data.get("special_approval")
     i = 0
-    while i < len(restrictions_content):
+    while i < num_contents:
         content = restrictions_content[i]
-        if content.string is None:
+        if content is None:
             logger.warning(
                 "Skipping unexpected restriction content with no string for "
                 f"CRN {crn} in term {term}"
             )
             i += 1
             continue
-        content_string = content.string.strip()
-        header_match = re.match(restriction_header_pattern, content_string) or re.match(
-            special_approvals_pattern, content_string
-        )
+        content_string = content.strip()
+        header_match = match_header(content_string)
         if header_match is None:
             i += 1
             continue
@@ -552,24 +885,24 @@ async def get_class_restrictions(session: aiohttp.ClientSession, term: str, crn:
             if "special_approval" not in restrictions_data:
                 i += 1
                 continue
-            restriction_list = restrictions_data["special_approval"]
+            restriction_list = special_approvals
         else:
-            must_or_cannot, type_plural = header_match.groups()
-            if type_plural not in _RESTRICTION_TYPE_MAP:
+            key = _RESTRICTION_KEY_MAP.get(header_match.groups())
+            if key is None:
                 logger.warning(
-                    f"Skipping unknown restriction type '{type_plural}' for CRN {crn} "
-                    f"in term {term}"
+                    f"Skipping unknown restriction type '{header_match.group(2)}' for "
+                    f"CRN {crn} in term {term}"
                 )
                 i += 1
                 continue
-            key_base = _RESTRICTION_TYPE_MAP[type_plural]
-            key = f"not_{key_base}" if must_or_cannot.lower() == "cannot" else key_base
             restriction_list = restrictions_data[key]
+        is_special_approval = restriction_list is special_approvals
+        append_restriction = restriction_list.append
         i += 1
         next_content_string = ""
-        while i < len(restrictions_content):
+        while i < num_contents:
             next_content = restrictions_content[i]
-            if next_content.string is None:
+            if next_content is None:
                 logger.warning(
                     f"Skipping unexpected restriction content with no string for "
                     f"CRN {crn} in term {term}"
@@ -586,23 +919,49 @@ async def get_class_restrictions(session: aiohttp.ClientSession, term: str, crn:
             # <span>Media</span>
             # <span> & Design (COMD)</span>
             if len(next_content_string) == 0:
-                next_content_string = next_content.string.lstrip()
+                next_content_string = next_content.lstrip()
             else:
-                next_content_string += f",{next_content.string}"
+                next_content_string += f",{next_content}"
             # Stop if another restriction header is encountered
-            if re.match(restriction_header_pattern, next_content_string) or re.match(
-                special_approvals_pattern, next_content_string
-            ):
+            if match_header(next_content_string) is not None:
                 break
-            if restriction_list is restrictions_data["special_approval"] or re.match(
-                r".*\(.*\)", next_content_string
-            ):
-                restriction_list.append(next_content_string.strip())
+            if is_special_approval or match_paren_closed(next_content_string):
+                append_restriction(html.unescape(next_content_string.strip()))
                 next_content_string = ""
             i += 1
     return restrictions_data
 
 
+def _node_string(node: LexborNode) -> str | None:
+    """
+    Returns the text of an HTML node if its only content is a single string,
+    following the same rules as BeautifulSoup's Tag.string.
+
+    @param node: The node to get the string of.
+    @return: The string content of the node, or None if the node is empty or has more
+        than one child.
+    """
+    child = node.child
+    if child is None or child.next is not None:
+        return None
+    if child.tag == "-text":
+        return child.text_content
+    return _node_string(child)
+
+
+def _match_restriction_header(text: str) -> re.Match | None:
+    """
+    Matches a restriction header, either a "Must/Cannot be enrolled in one of the
+    following ...:" header or a "Special Approvals:" header.
+
+    @param text: The text of a restriction section <span> tag.
+    @return: The match object of the header, or None if the text is not a header.
+    """
+    if not text.startswith(_RESTRICTION_HEADER_PREFIXES):
+        return None
+    return _RESTRICTION_HEADER_RE.match(text) or _SPECIAL_APPROVALS_RE.match(text)
+
+
 async def get_class_prerequisites(
     session: aiohttp.ClientSession, term: str, crn: str
 ) -> dict[str, Any]:
@@ -610,7 +969,8 @@ async def get_class_prerequisites(
     Fetches and parses data from the "Prerequisites" tab of a class details
     page.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code of the class.
     @param crn: The course reference number of the class.
     @return: A dictionary in the following format:
@@ -639,7 +999,7 @@ async def get_class_prerequisites(
     #     response.raise_for_status()
     #     text = await response.text()
     # text = html.unescape(text)
-    # soup = bs4.BeautifulSoup(text, "html5lib")
+    # soup = bs4.BeautifulSoup(text, "lxml")
     # data = ""
     # rows = soup.find_all("tr")
     # for row in rows:
@@ -682,7 +1042,8 @@ async def get_class_corequisites(
     Fetches and parses data from the "Corequisites" tab of a class details
     page.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code of the class.
     @param crn: The course reference number of the class.
     @return: A list of dictionaries in the following format:
@@ -699,18 +1060,18 @@ async def get_class_corequisites(
     """
     url = _BASE_URL + "searchResults/getCorequisites"
     params = {"term": term, "courseReferenceNumber": crn}
-    raw_data = await retry_get(session, url, params)
-    raw_data = html_unescape(raw_data)
-    soup = bs4.BeautifulSoup(raw_data, "html5lib")
-    coreqs_tag = soup.find("section", {"aria-labelledby": "coReqs"})
-    coreqs_table = coreqs_tag.find("table", {"class": "basePreqTable"})
+    raw_data = await retry_get_bytes(session, url, params)
+    tree = LexborHTMLParser(raw_data)
+    coreqs_table = tree.css_first(
+        'section[aria-labelledby="coReqs"] table.basePreqTable'
+    )
     if coreqs_table is None:
         return []
-    coreqs_thead = coreqs_table.thead
-    coreqs_tbody = coreqs_table.tbody
-    if not coreqs_thead or not coreqs_tbody:
+    coreqs_thead = coreqs_table.css_first("thead")
+    coreqs_tbody = coreqs_table.css_first("tbody")
+    if coreqs_thead is None or coreqs_tbody is None:
         return []
-    thead_cols = [th.text.strip() for th in coreqs_thead.find_all("th")]
+    thead_cols = [th.text().strip() for th in coreqs_thead.css("th")]
     # Known corequisite columns are Subject, Course Number, and Title
     if len(thead_cols) != 3:
         logger.warning(
@@ -718,8 +1079,8 @@ async def get_class_corequisites(
         )
         return []
     coreqs = []
-    for tr in coreqs_tbody.find_all("tr"):
-        cols = [td.text.strip() for td in tr.find_all("td")]
+    for tr in coreqs_tbody.css("tr"):
+        cols = [html.unescape(td.text().strip()) for td in tr.css("td")]
         if len(cols) != len(thead_cols):
             logger.warning(
                 f"Skipping unexpected corequisite row with mismatched columns for "
@@ -742,7 +1103,8 @@ async def get_class_crosslists(
     Fetches and parses data from the "Cross Listed" tab of a class details
     page.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code of the class.
     @param crn: The course reference number of the class.
     @return: A list of dictionaries in the following format:
@@ -761,18 +1123,16 @@ async def get_class_crosslists(
     """
     url = _BASE_URL + "searchResults/getXlstSections"
     params = {"term": term, "courseReferenceNumber": crn}
-    raw_data = await retry_get(session, url, params)
-    raw_data = html_unescape(raw_data)
-    soup = bs4.BeautifulSoup(raw_data, "html5lib")
-    crosslists_tag = soup.find("section", {"aria-labelledby": "xlstSections"})
-    crosslists_table = crosslists_tag.table
+    raw_data = await retry_get_bytes(session, url, params)
+    tree = LexborHTMLParser(raw_data)
+    crosslists_table = tree.css_first('section[aria-labelledby="xlstSections"] table')
     if crosslists_table is None:
         return []
-    crosslists_thead = crosslists_table.thead
-    crosslists_tbody = crosslists_table.tbody
-    if not crosslists_thead or not crosslists_tbody:
+    crosslists_thead = crosslists_table.css_first("thead")
+    crosslists_tbody = crosslists_table.css_first("tbody")
+    if crosslists_thead is None or crosslists_tbody is None:
         return []
-    thead_cols = [th.text.strip() for th in crosslists_thead.find_all("th")]
+    thead_cols = [th.text().strip() for th in crosslists_thead.css("th")]
     # Known crosslist columns are CRN, Subject, Course Number, Title, and Section
     if len(thead_cols) != 5:
         logger.warning(
@@ -780,8 +1140,8 @@ async def get_class_crosslists(
         )
         return []
     crosslists = []
-    for tr in crosslists_tbody.find_all("tr"):
-        cols = [td.text.strip() for td in tr.find_all("td")]
+    for tr in crosslists_tbody.css("tr"):
+        cols = [html.unescape(td.text().strip()) for td in tr.css("td")]
         if len(cols) != len(thead_cols):
             logger.warning(
                 f"Skipping unexpected crosslist row with mismatched columns for "
@@ -810,7 +1170,8 @@ async def get_class_faculty_meetings(
     Fetches and parses data from the "Instructor/Meeting Times" tab of a class details
     page.
 
-    @param session: An aiohttp ClientSession to use for the request.
+    @param session: An aiohttp ClientSession to use for the request. The same session
+        should be reused across calls, e.g. one opened with sis_session().
     @param term: The term code of the class.
     @param crn: The course reference number of the class.
     @return: A dictionary containing faculty and meeting lists in the following format:
@@ -848,9 +1209,8 @@ async def get_class_faculty_meetings(
     """
     url = _BASE_URL + "searchResults/getFacultyMeetingTimes"
     params = {"term": term, "courseReferenceNumber": crn}
-    raw_data = await retry_get(session, url, params)
-    json_data = json.loads(raw_data)
-    json_data = html_unescape(json_data)
+    raw_data = await retry_get_bytes(session, url, params)
+    json_data = parse_json(raw_data)
     sis_faculty_meetings_list = json_data["fmt"]
     meetings_list = _process_class_faculty_meetings(
         sis_faculty_meetings_list, term, crn
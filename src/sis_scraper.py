@@ -1,15 +1,19 @@
 import asyncio
 import datetime as dt
-import json
+import functools
 import logging
+import operator
+import sys
 import time
-import traceback
+from collections.abc import Awaitable, Callable
 from pathlib import Path
 from typing import Any
 
 import aiohttp
+import orjson
+from detail_cache import DetailCache
 from sis_api import (
-    class_search,
+    DETAIL_PARSER_VERSION,
     get_class_attributes,
     get_class_corequisites,
     get_class_crosslists,
@@ -19,12 +23,26 @@ from sis_api import (
     get_class_faculty_meetings,
     get_class_prerequisites,
     get_class_restrictions,
-    get_term_subjects,
+    get_term_subjects_etag,
+    get_term_subjects_with_etag,
+    iter_class_search,
+    parse_section_attributes,
     reset_class_search,
+    sis_session,
 )
 
 logger = logging.getLogger(__name__)
 
+# Time in seconds that resolved SIS addresses are cached by the shared connector
+_DNS_CACHE_TTL = 300
+
+# Maps academic seasons to the suffix of their term codes
+_SEASON_SUFFIXES = {
+    "fall": "09",
+    "summer": "05",
+    "spring": "01",
+}
+
 
 def get_term_code(year: str | int, season: str) -> str:
     """
@@ -35,23 +53,38 @@ def get_term_code(year: str | int, season: str) -> str:
         "Summer".
     @return: Term code as a string, e.g. "202309" for Fall 2023.
     """
-    if year is None or season is None:
+    if year is None or not isinstance(season, str):
         return ""
-    if not isinstance(season, str):
+    suffix = _SEASON_SUFFIXES.get(season.lower().strip())
+    if suffix is None:
         return ""
-    try:
-        year_int = int(year)
-        if year_int < 1000 or year_int > 9999:
-            return ""
-    except (ValueError, TypeError):
+    # Year must be a four-digit number from 1000 to 9999
+    year_str = str(year).strip()
+    if (
+        len(year_str) != 4
+        or not year_str.isascii()
+        or not year_str.isdigit()
+        or year_str[0] == "0"
+    ):
         return ""
-    season_lower = season.lower().strip()
-    season_map = {
-        "fall": f"{year_int}09",
-        "summer": f"{year_int}05",
-        "spring": f"{year_int}01",
-    }
-    return season_map.get(season_lower, "")
+    return f"{year_str}{suffix}"
+
+
+def get_current_term_code(date: dt.date | None = None) -> str:
+    """
+    Gets the code of the academic term in progress on a given date. Summer terms
+    start in May and fall terms start in September.
+
+    @param date: The date to get the term of. Defaults to today.
+    @return: Term code as a string, e.g. "202509" for a date in Fall 2025.
+    """
+    if date is None:
+        date = dt.date.today()
+    if date.month >= 9:
+        return f"{date.year}09"
+    if date.month >= 5:
+        return f"{date.year}05"
+    return f"{date.year}01"
 
 
 def write_json(json_data: dict[str, Any], output_path: Path | str) -> None:
@@ -63,9 +96,85 @@ def write_json(json_data: dict[str, Any], output_path: Path | str) -> None:
     """
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    logger.info(f"Writing data to {output_path}")
-    with output_path.open("w", encoding="utf-8") as f:
-        json.dump(json_data, f, indent=4, ensure_ascii=False)
+    # orjson only supports 2-space indentation, so output is indented by 2 spaces
+    # rather than the 4 spaces written by earlier versions that used the json module
+    output_path.write_bytes(orjson.dumps(json_data, option=orjson.OPT_INDENT_2))
+
+
+def write_term_json(
+    subjects: list[tuple[str, str, Path]], output_path: Path | str
+) -> None:
+    """
+    Writes term course data JSON to a file by concatenating the JSON shards written for
+    each subject, so that only one subject's course data is in memory at a time. The
+    output is the same as write_json() on the full term course data.
+
+    @param subjects: List of (subject code, subject description, shard path) tuples in
+        the order to write them. Subjects without a shard file have no courses.
+    @param output_path: The path to the file to write the JSON data to.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("wb") as f:
+        f.write(b"{")
+        for i, (subject_code, subject_desc, shard_path) in enumerate(subjects):
+            if shard_path.exists():
+                # Indent shard lines to their depth in the term data, which is safe
+                # since newlines within JSON strings are always escaped
+                courses = shard_path.read_bytes().replace(b"\n", b"\n    ")
+            else:
+                courses = b"{}"
+            f.write(b",\n  " if i > 0 else b"\n  ")
+            f.write(orjson.dumps(subject_code))
+            f.write(b': {\n    "subjectDescription": ')
+            f.write(orjson.dumps(subject_desc))
+            f.write(b',\n    "courses": ')
+            f.write(courses)
+            f.write(b"\n  }")
+        f.write(b"\n}" if len(subjects) > 0 else b"}")
+
+
+def _add_classes_to_shard(
+    shard_path: Path, classes: list[tuple[str, dict[str, Any]]]
+) -> None:
+    """
+    Adds class entries to a subject's course data shard, creating the shard if the
+    subject has none.
+
+    @param shard_path: Path to the subject's shard file.
+    @param classes: List of (course number, class entry) tuples to add.
+    """
+    subj_course_data = {}
+    if shard_path.exists():
+        subj_course_data = orjson.loads(shard_path.read_bytes())
+    for course_num, class_entry in classes:
+        if course_num not in subj_course_data:
+            subj_course_data[course_num] = []
+        subj_course_data[course_num].append(class_entry)
+    write_json(subj_course_data, shard_path)
+
+
+def _fetch_class_data(
+    fetcher: Callable[[aiohttp.ClientSession, str, str], Awaitable[Any]],
+    session: aiohttp.ClientSession,
+    term: str,
+    crn: str,
+    detail_cache: DetailCache | None = None,
+) -> Awaitable[Any]:
+    """
+    Calls a class detail fetcher, reading its result from the detail cache instead if
+    one is provided.
+
+    @param fetcher: A class detail fetcher from sis_api, e.g. get_class_description.
+    @param session: aiohttp client session to use for requests.
+    @param term: Term code of the class.
+    @param crn: CRN of the class.
+    @param detail_cache: Optional on-disk cache of class details.
+    @return: An awaitable resolving to the result of the fetcher.
+    """
+    if detail_cache is None:
+        return fetcher(session, term, crn)
+    return detail_cache.fetch(fetcher, session, term, crn)
 
 
 async def process_class_details(
@@ -74,6 +183,8 @@ async def process_class_details(
     sis_class_entry: dict[str, Any] | None = None,
     term: str | None = None,
     crn: str | None = None,
+    detail_cache: DetailCache | None = None,
+    class_semaphore: asyncio.Semaphore | None = None,
 ) -> tuple[str, str, dict[str, Any]]:
     """
     Fetches and parses all details for a given class. Returns a tuple containing
@@ -89,16 +200,22 @@ async def process_class_details(
         sis_class_entry is not provided.
     @param crn: CRN of the class to fetch details for. Required if
         sis_class_entry is not provided.
-    @return: A tuple of (subject description, course number, class entry data),
-        or None on error.
+    @param detail_cache: Optional on-disk cache to read class details from before
+        fetching them from SIS. Enrollment data is never cached.
+    @param class_semaphore: Optional semaphore to limit number of classes fetching
+        details concurrently between multiple calls to this function.
+    @return: A tuple of (subject description, course number, class entry data).
+    @raise ExceptionGroup: If any of the class's details could not be fetched.
     """
     if sis_class_entry is None and (term is None or crn is None):
         raise ValueError("Either sis_class_entry or both term and crn must be provided")
 
     # Extract basic class details from SIS class entry if provided
     if sis_class_entry is not None:
-        subject_desc = sis_class_entry["subjectDescription"]
-        course_num = sis_class_entry["courseNumber"]
+        # Subject descriptions and course numbers are shared by many sections and used
+        # as dict keys, so intern them to share one string object per value
+        subject_desc = sys.intern(sis_class_entry["subjectDescription"])
+        course_num = sys.intern(sis_class_entry["courseNumber"])
         term = sis_class_entry["term"]
         crn = sis_class_entry["courseReferenceNumber"]
 
@@ -131,48 +248,79 @@ async def process_class_details(
         "meetingInfo": [],
     }
 
-    # Fetch class details not included in SIS class search
-    async with asyncio.TaskGroup() as tg:
-        description_task = tg.create_task(get_class_description(session, term, crn))
-        attributes_task = tg.create_task(get_class_attributes(session, term, crn))
-        restrictions_task = tg.create_task(get_class_restrictions(session, term, crn))
-        prerequisites_task = tg.create_task(get_class_prerequisites(session, term, crn))
-        corequisites_task = tg.create_task(get_class_corequisites(session, term, crn))
-        crosslists_task = tg.create_task(get_class_crosslists(session, term, crn))
-        faculty_meetings_task = tg.create_task(
-            get_class_faculty_meetings(session, term, crn)
-        )
+    fetch = functools.partial(
+        _fetch_class_data,
+        session=session,
+        term=term,
+        crn=crn,
+        detail_cache=detail_cache,
+    )
+
+    # Create default semaphore if not provided
+    if class_semaphore is None:
+        class_semaphore = asyncio.Semaphore(1)
+
+    # Attributes are included in SIS class search results, so they are only fetched
+    # separately if the class search entry doesn't have them
+    section_attributes = None
+    if sis_class_entry is not None:
+        section_attributes = sis_class_entry.get("sectionAttributes")
+
+    # Fetch class details not included in SIS class search, keyed by the class entry
+    # field they fill
+    async with class_semaphore:
+        detail_tasks = {
+            "description": asyncio.create_task(fetch(get_class_description)),
+            "restrictions": asyncio.create_task(fetch(get_class_restrictions)),
+            "prerequisites": asyncio.create_task(fetch(get_class_prerequisites)),
+            "corequisites": asyncio.create_task(fetch(get_class_corequisites)),
+            "crosslists": asyncio.create_task(fetch(get_class_crosslists)),
+            "facultyMeetings": asyncio.create_task(fetch(get_class_faculty_meetings)),
+        }
+        if section_attributes is None:
+            detail_tasks["attributes"] = asyncio.create_task(
+                fetch(get_class_attributes)
+            )
         # Fetch full class details if not provided from SIS class search
         if sis_class_entry is None:
-            details_task = tg.create_task(get_class_details(session, term, crn))
-            enrollment_task = tg.create_task(get_class_enrollment(session, term, crn))
-
-    # Wait for tasks to complete and get results
-    description_data = description_task.result()
-    attributes_data = attributes_task.result()
-    restrictions_data = restrictions_task.result()
-    prerequisites_data = prerequisites_task.result()
-    corequisites_data = corequisites_task.result()
-    crosslists_data = crosslists_task.result()
-    faculty_meetings_data = faculty_meetings_task.result()
-    if sis_class_entry is None:
-        details_data = details_task.result()
-        enrollment_data = enrollment_task.result()
+            detail_tasks["details"] = asyncio.create_task(fetch(get_class_details))
+            # Seat counts change often, so enrollment data always comes from SIS
+            detail_tasks["enrollment"] = asyncio.create_task(
+                get_class_enrollment(session, term, crn)
+            )
+        # Wait for all requests to finish, without one failed request cancelling the
+        # others like a TaskGroup would
+        await asyncio.gather(*detail_tasks.values(), return_exceptions=True)
+
+    # A class missing any of its details would be indistinguishable from a class whose
+    # details are empty, so failing to fetch any of them fails the whole class
+    errors = [task.exception() for task in detail_tasks.values() if task.exception()]
+    if len(errors) > 0:
+        failed_fields = [
+            field for field, task in detail_tasks.items() if task.exception()
+        ]
+        raise ExceptionGroup(
+            f"Failed to fetch {', '.join(failed_fields)} for CRN {crn} in term {term}",
+            errors,
+        )
 
-    # Extract subject and course number from full details if SIS class entry not provided
     if sis_class_entry is None:
-        subject_desc = details_data["subjectName"]
-        course_num = details_data["courseNumber"]
+        details_data = detail_tasks.pop("details").result()
+        enrollment_data = detail_tasks.pop("enrollment").result()
+        # Extract subject and course number from full details
+        subject_desc = sys.intern(details_data["subjectName"])
+        course_num = sys.intern(details_data["courseNumber"])
 
     # Fill class entry with fetched details
-    class_entry["description"] = description_data
-    class_entry["attributes"] = attributes_data
-    class_entry["restrictions"] = restrictions_data
-    class_entry["prerequisites"] = prerequisites_data
-    class_entry["corequisites"] = corequisites_data
-    class_entry["crosslists"] = crosslists_data
-    class_entry["faculty"] = faculty_meetings_data["faculty"]
-    class_entry["meetingInfo"] = faculty_meetings_data["meetings"]
+    if section_attributes is not None:
+        class_entry["attributes"] = parse_section_attributes(section_attributes)
+    for field, task in detail_tasks.items():
+        if field == "facultyMeetings":
+            faculty_meetings_data = task.result()
+            class_entry["faculty"] = faculty_meetings_data["faculty"]
+            class_entry["meetingInfo"] = faculty_meetings_data["meetings"]
+        else:
+            class_entry[field] = task.result()
     # Fill class entry with SIS class search data if provided
     if sis_class_entry is not None:
         class_entry["sectionNumber"] = sis_class_entry["sequenceNumber"]
@@ -203,24 +351,26 @@ async def process_class_details(
 
 async def resolve_hidden_classes(
     term: str,
-    term_course_data: dict[str, dict[str, Any]],
+    crosslist_crn_set: set[str],
     term_crn_set: set[str],
+    session: aiohttp.ClientSession,
     semaphore: asyncio.Semaphore | None = None,
-    tcp_connector: aiohttp.TCPConnector | None = None,
-    timeout: int = 30,
+    detail_cache: DetailCache | None = None,
+    class_semaphore: asyncio.Semaphore | None = None,
 ) -> list[tuple[str, str, dict[str, Any]]]:
     """
-    Checks all crosslist CRNs in the term course data for any hidden classes not shown in
-    the main class search and fetches their details to add to the term course data.
+    Checks all crosslist CRNs in the term for any hidden classes not shown in the main
+    class search and fetches their details to add to the term course data.
 
     @param term: Term code to fetch hidden classes for.
-    @param term_course_data: The current term course data to check for hidden classes.
+    @param crosslist_crn_set: Set of all CRNs crosslisted with classes in the term.
     @param term_crn_set: Set of all CRNs processed in the term.
-    @param semaphore: Optional semaphore to limit number of concurrent sessions between
-        multiple calls to this function.
-    @param tcp_connector: Optional TCP connector to use for client sessions. If not
-        provided, sessions will use a default connector.
-    @param timeout: Timeout in seconds for all requests made by a session.
+    @param session: Shared client session to use for class detail requests.
+    @param semaphore: Optional semaphore to limit number of concurrent subjects and
+        hidden class lookups between multiple calls to this function.
+    @param detail_cache: Optional on-disk cache of class details.
+    @param class_semaphore: Optional semaphore to limit number of classes fetching
+        details concurrently.
     @return: List of tuples containing subject description, course number, and
         class entry data for each hidden class found.
     """
@@ -229,39 +379,26 @@ async def resolve_hidden_classes(
         semaphore = asyncio.Semaphore(1)
 
     async with semaphore:
-        timeout_obj = aiohttp.ClientTimeout(total=timeout)
-
-        client_session_params = {
-            "connector": tcp_connector,
-            "connector_owner": False if tcp_connector else True,
-            "timeout": timeout_obj,
-        }
-        async with aiohttp.ClientSession(**client_session_params) as session:
-            hidden_crns = {
-                crosslist["courseReferenceNumber"]
-                for subject in term_course_data.values()
-                for course in subject["courses"].values()
-                for class_entry in course
-                for crosslist in class_entry["crosslists"]
-                if crosslist["courseReferenceNumber"] not in term_crn_set
-            }
-            if len(hidden_crns) > 0:
-                hidden_class_tasks = []
-                async with asyncio.TaskGroup() as tg:
-                    for crn in hidden_crns:
-                        task = tg.create_task(
-                            process_class_details(
-                                session,
-                                term_crn_set,
-                                term=term,
-                                crn=crn,
-                            )
-                        )
-                        hidden_class_tasks.append(task)
-                        logger.info(
-                            f"Processing hidden class with CRN {crn} in term {term}"
+        hidden_crns = crosslist_crn_set - term_crn_set
+        if len(hidden_crns) > 0:
+            hidden_class_tasks = []
+            async with asyncio.TaskGroup() as tg:
+                for crn in hidden_crns:
+                    task = tg.create_task(
+                        process_class_details(
+                            session,
+                            term_crn_set,
+                            term=term,
+                            crn=crn,
+                            detail_cache=detail_cache,
+                            class_semaphore=class_semaphore,
                         )
-                return [task.result() for task in hidden_class_tasks]
+                    )
+                    hidden_class_tasks.append(task)
+                    logger.info(
+                        f"Processing hidden class with CRN {crn} in term {term}"
+                    )
+            return [task.result() for task in hidden_class_tasks]
         return []
 
 
@@ -269,202 +406,272 @@ async def get_subject_course_data(
     term: str,
     subject_code: str,
     term_crn_set: set[str],
-    semaphore: asyncio.Semaphore | None = None,
+    session: aiohttp.ClientSession,
     tcp_connector: aiohttp.TCPConnector | None = None,
     timeout: int = 30,
-) -> dict[str, dict[str, Any]]:
+    detail_cache: DetailCache | None = None,
+    class_semaphore: asyncio.Semaphore | None = None,
+    crosslist_crn_set: set[str] | None = None,
+    shard_path: Path | str | None = None,
+) -> dict[str, dict[str, Any]] | None:
     """
     Gets all course data for a given term and subject.
 
-    This function spawns its own client session to avoid session state conflicts with
-    other subjects that may be processing concurrently.
+    The class search is run in its own short-lived client session to avoid search
+    state conflicts with other subjects that may be processing concurrently. Class
+    details are stateless and are fetched through the shared session instead.
 
     @param term: Term code to fetch data for.
     @param subject_code: Subject code to fetch data for, e.g. "CSCI".
     @param term_crn_set: Set of all CRNs processed in the term.
-    @param semaphore: Optional semaphore to limit number of concurrent sessions between
-        multiple calls to this function.
-    @param tcp_connector: Optional TCP connector to use for the session. If not
-        provided, the session will use a default connector.
-    @param timeout: Timeout in seconds for all requests made by a session.
-    @return: Dictionary of course data keyed by course code.
+    @param session: Shared client session to use for class detail requests.
+    @param tcp_connector: Optional TCP connector to use for the class search session.
+        If not provided, the session will use a default connector.
+    @param timeout: Timeout in seconds for all requests made by the class search
+        session.
+    @param detail_cache: Optional on-disk cache of class details.
+    @param class_semaphore: Optional semaphore to limit number of classes fetching
+        details concurrently.
+    @param crosslist_crn_set: Optional set to add the CRNs of all classes crosslisted
+        with the subject's classes to.
+    @param shard_path: Optional path to write the course data JSON to instead of
+        returning it. No file is written if the subject has no classes.
+    @return: Dictionary of course data keyed by course code, or None if shard_path is
+        provided.
     """
-    # Create default semaphore if not provided
-    if semaphore is None:
-        semaphore = asyncio.Semaphore(1)
-
-    async with semaphore:
-        timeout_obj = aiohttp.ClientTimeout(total=timeout)
-
-        client_session_params = {
-            "connector": tcp_connector,
-            "connector_owner": False if tcp_connector else True,
-            "timeout": timeout_obj,
-        }
-        async with aiohttp.ClientSession(**client_session_params) as session:
-            try:
+    try:
+        # Process class entries in parallel as they are streamed from the class
+        # search, keeping the course code and section number of each to sort by
+        tasks: list[tuple[tuple[str, str], asyncio.Task]] = []
+        async with asyncio.TaskGroup() as tg:
+            async with sis_session(tcp_connector, timeout) as search_session:
                 # Reset search state on server before fetching class data
-                await reset_class_search(session, term)
-                sis_class_data = await class_search(session, term, subject_code)
-                if len(sis_class_data) == 0:
-                    logger.info(
-                        f"No classes found for subject {subject_code} in term {term}"
-                    )
-                    return {}
-
-                # Process class entries from the class search in parallel
-                tasks: list[asyncio.Task] = []
-                async with asyncio.TaskGroup() as tg:
-                    for sis_class_entry in sis_class_data:
-                        task = tg.create_task(
-                            process_class_details(
-                                session,
-                                term_crn_set,
-                                sis_class_entry,
-                            )
+                await reset_class_search(search_session, term)
+                async for sis_class_entry in iter_class_search(
+                    search_session, term, subject_code
+                ):
+                    task = tg.create_task(
+                        process_class_details(
+                            session,
+                            term_crn_set,
+                            sis_class_entry,
+                            detail_cache=detail_cache,
+                            class_semaphore=class_semaphore,
                         )
-                        tasks.append(task)
-
-                # Build subject course data
-                subj_course_data = {}
-                for task in tasks:
-                    result = task.result()
-                    if result:
-                        _, course_num, class_entry = result
-                        if course_num not in subj_course_data:
-                            subj_course_data[course_num] = []
-                        subj_course_data[course_num].append(class_entry)
-
-                # Sort class entries by section number
-                for course_num in subj_course_data:
-                    subj_course_data[course_num] = sorted(
-                        subj_course_data[course_num],
-                        key=lambda class_entry: class_entry["sectionNumber"],
                     )
+                    sort_key = (
+                        sis_class_entry["courseNumber"],
+                        sis_class_entry["sequenceNumber"],
+                    )
+                    tasks.append((sort_key, task))
+
+        if len(tasks) == 0:
+            logger.info(f"No classes found for subject {subject_code} in term {term}")
+            if shard_path is not None:
+                # Remove any shard left over from an earlier failed run
+                Path(shard_path).unlink(missing_ok=True)
+                return None
+            return {}
+
+        # Sort class entries by course code and section number, so that the course
+        # data built from them below is already in sorted order
+        tasks.sort(key=operator.itemgetter(0))
+
+        # Build subject course data, which is sorted by course code with class
+        # entries sorted by section number
+        subj_course_data = {}
+        for _, task in tasks:
+            _, course_num, class_entry = task.result()
+            if course_num not in subj_course_data:
+                subj_course_data[course_num] = []
+            subj_course_data[course_num].append(class_entry)
+            if crosslist_crn_set is not None:
+                crosslist_crn_set.update(
+                    crosslist["courseReferenceNumber"]
+                    for crosslist in class_entry["crosslists"]
+                )
 
-                # Return data sorted by course code
-                return dict(sorted(subj_course_data.items()))
+        if shard_path is not None:
+            if len(subj_course_data) > 0:
+                await asyncio.to_thread(write_json, subj_course_data, shard_path)
+            else:
+                Path(shard_path).unlink(missing_ok=True)
+            return None
+        return subj_course_data
 
-            except Exception as e:
-                raise RuntimeError(
-                    f"Error fetching course data for subject {subject_code} "
-                    f"in term {term}"
-                ) from e
+    except Exception as e:
+        raise RuntimeError(
+            f"Error fetching course data for subject {subject_code} " f"in term {term}"
+        ) from e
 
 
 async def get_term_course_data(
     term: str,
     output_path: Path | str,
+    session: aiohttp.ClientSession,
     semaphore: asyncio.Semaphore | None = None,
     tcp_connector: aiohttp.TCPConnector | None = None,
     timeout: int = 30,
+    detail_cache: DetailCache | None = None,
+    class_semaphore: asyncio.Semaphore | None = None,
+    skip_unchanged_closed_terms: bool = False,
 ) -> bool:
     """
     Gets all course data for a given term, which includes all subjects in the
     term.
 
-    This function spawns a client session for each subject to be processed in the
-    term. Writes data as JSON after all subjects in the term have been processed.
+    Class details for all subjects in the term are fetched through the shared session,
+    while each subject's class search runs in its own short-lived session. Each subject's
+    course data is written to a shard file in a "shards" directory next to the output
+    path as soon as it is processed, and the shards are merged into the term data JSON
+    file after all subjects in the term have been processed.
 
     @param term: Term code to fetch data for.
     @param output_path: Path to write term course data JSON file to.
-    @param semaphore: Optional semaphore to limit number of concurrent sessions.
-    @param tcp_connector: Optional TCP connector to use for all sessions. If not
-        provided, sessions will use default connectors.
-    @param timeout: Timeout in seconds for all requests made by a session.
-    @return: True on success, False on any unhandled failure.
+    @param session: Shared client session to use for stateless requests.
+    @param semaphore: Optional semaphore to limit number of concurrent subjects. A
+        subject's task is only created once the semaphore has been acquired for it.
+    @param tcp_connector: Optional TCP connector to use for class search sessions. If
+        not provided, sessions will use default connectors.
+    @param timeout: Timeout in seconds for all requests made by a class search session.
+    @param detail_cache: Optional on-disk cache of class details.
+    @param class_semaphore: Optional semaphore to limit number of classes fetching
+        details concurrently.
+    @param skip_unchanged_closed_terms: Whether to skip a term that has ended if its
+        subject list ETag matches the one stored when its data was last written. The
+        ETag only covers the subject list, so changes to the term's classes made after
+        the term ended are missed while this is enabled.
+    @return: True on success, False on any unhandled failure. The first class that fails
+        to process cancels the rest of the term, since term data missing classes would
+        look complete to postprocessing. No term data is written on failure, and any
+        subject shards already written for the term are removed.
     """
-    timeout_obj = aiohttp.ClientTimeout(total=timeout)
-    client_session_params = {
-        "connector": tcp_connector,
-        "connector_owner": False if tcp_connector else True,
-        "timeout": timeout_obj,
-    }
+    output_path = Path(output_path)
+    # Stores the code, description, and shard path of each subject in the term
+    term_subjects: list[tuple[str, str, Path]] = []
+    # ETag of the term's subject list when the term data was last written. Only stored
+    # for terms that have ended, since their data rarely changes.
+    etag_path = output_path.with_suffix(".etag")
+    is_closed_term = term < get_current_term_code()
     try:
-        async with aiohttp.ClientSession(**client_session_params) as session:
-            subjects = await get_term_subjects(session, term)
+        # Skip terms that have ended and whose subject list is unchanged since they were
+        # last scraped, if requested
+        if (
+            skip_unchanged_closed_terms
+            and is_closed_term
+            and output_path.exists()
+            and etag_path.exists()
+        ):
+            etag = etag_path.read_text(encoding="utf-8").strip()
+            if await get_term_subjects_etag(session, term, etag) == etag:
+                logger.info(f"Skipping unchanged term {term}, already in {output_path}")
+                return True
+
+        # Keep the ETag of the subject list used for this scrape to store with the term
+        subjects, subjects_etag = await get_term_subjects_with_etag(session, term)
 
         if len(subjects) == 0:
             logger.info(f"No subjects found for term {term}")
             return False
         logger.info(f"Processing {len(subjects)} subjects for term {term}")
 
-        # Stores all course data for the term
-        term_course_data = {}
+        # Create default semaphore if not provided
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(len(subjects))
+
+        # Each subject's course data is written to its own shard file as soon as the
+        # subject is processed, then the shards are merged into the term data file
+        shard_dir = output_path.parent / "shards"
+        term_subjects = [
+            (
+                subject["code"],
+                subject["description"],
+                shard_dir / f"{term}.{subject['code']}.json",
+            )
+            for subject in subjects
+        ]
         # Stores all CRNs for the term
         term_crn_set = set()
+        # Stores all CRNs crosslisted with classes in the term
+        crosslist_crn_set = set()
 
-        # Process subjects in parallel, each with its own session
-        tasks: list[asyncio.Task] = []
+        # Process subjects in parallel, each with its own class search session
         async with asyncio.TaskGroup() as tg:
-            for subject in subjects:
-                subject_code = subject["code"]
-                subject_desc = subject["description"]
-                term_course_data[subject_desc] = {
-                    "subjectCode": subject_code,
-                    "courses": {},
-                }
+            for subject_code, _, shard_path in term_subjects:
+                # Wait for capacity before creating the subject's task, so subjects
+                # that can't run yet don't pile up as pending tasks
+                await semaphore.acquire()
                 task = tg.create_task(
                     get_subject_course_data(
                         term,
                         subject_code,
                         term_crn_set,
-                        semaphore=semaphore,
+                        session,
                         tcp_connector=tcp_connector,
                         timeout=timeout,
+                        detail_cache=detail_cache,
+                        class_semaphore=class_semaphore,
+                        crosslist_crn_set=crosslist_crn_set,
+                        shard_path=shard_path,
                     )
                 )
-                tasks.append(task)
-
-        # Wait for all tasks to complete and gather results
-        for i, subject in enumerate(subjects):
-            course_data = tasks[i].result()
-            term_course_data[subject["description"]]["courses"] = course_data
+                task.add_done_callback(lambda _: semaphore.release())
 
         # Stop if no course data was fetched for the term
         # Likely indicates a scraper error since every valid term should have some data
-        if all(
-            len(subject_data["courses"]) == 0
-            for subject_data in term_course_data.values()
-        ):
+        if not any(shard_path.exists() for _, _, shard_path in term_subjects):
             logger.warning(f"No course data found for term {term}")
             return False
 
-        # Check for hidden classes via crosslists and add them to term course data
+        # Check for hidden classes via crosslists and add them to their subjects' shards
         hidden_classes = await resolve_hidden_classes(
-            term, term_course_data, term_crn_set, semaphore, tcp_connector, timeout
+            term,
+            crosslist_crn_set,
+            term_crn_set,
+            session,
+            semaphore,
+            detail_cache,
+            class_semaphore,
         )
+        hidden_classes_by_desc: dict[str, list[tuple[str, dict[str, Any]]]] = {}
         for subject_desc, course_num, class_entry in hidden_classes:
-            if subject_desc in term_course_data:
-                subj_course_data = term_course_data[subject_desc]["courses"]
-                if course_num not in subj_course_data:
-                    subj_course_data[course_num] = []
-                subj_course_data[course_num].append(class_entry)
-            else:
+            hidden_classes_by_desc.setdefault(subject_desc, []).append(
+                (course_num, class_entry)
+            )
+        for _, subject_desc, shard_path in term_subjects:
+            if subject_desc in hidden_classes_by_desc:
+                await asyncio.to_thread(
+                    _add_classes_to_shard,
+                    shard_path,
+                    hidden_classes_by_desc.pop(subject_desc),
+                )
+        for subject_desc, subject_hidden_classes in hidden_classes_by_desc.items():
+            for _, class_entry in subject_hidden_classes:
                 logger.warning(
-                    f"Subject {subject_desc} not found in term_course_data "
+                    f"Subject {subject_desc} not found in term subjects "
                     f"for CRN {class_entry['courseReferenceNumber']}"
                 )
 
-        # Convert term course data to be keyed by subject code instead of description
-        term_course_data_by_code = {}
-        for subject_desc, data in term_course_data.items():
-            subject_code = data["subjectCode"]
-            term_course_data_by_code[subject_code] = {
-                "subjectDescription": subject_desc,
-                **data,
-            }
-            # Remove redundant subject code entry
-            del term_course_data_by_code[subject_code]["subjectCode"]
-        term_course_data = term_course_data_by_code
-
-        # Write all term data to JSON file
-        write_json(term_course_data, output_path)
+        # Merge subject shards into the term data JSON file off the event loop, so that
+        # other terms keep processing while it is written
+        logger.info(f"Writing data to {output_path}")
+        await asyncio.to_thread(write_term_json, term_subjects, output_path)
+        for _, _, shard_path in term_subjects:
+            shard_path.unlink(missing_ok=True)
+
+        # Store the subject list ETag so this term can be skipped on later runs. Only
+        # reached if no class failed, since a term with missing classes must be scraped
+        # again.
+        if is_closed_term:
+            if subjects_etag is not None:
+                etag_path.write_text(subjects_etag, encoding="utf-8")
+            else:
+                etag_path.unlink(missing_ok=True)
 
     except Exception as e:
-        logger.error(
-            f"Error processing term {term}, aborting term: {e}\n{traceback.format_exc()}"
-        )
+        logger.exception(f"Error processing term {term}, aborting term: {e}")
+        for _, _, shard_path in term_subjects:
+            shard_path.unlink(missing_ok=True)
         return False
 
     return True
@@ -476,15 +683,18 @@ async def main(
     end_year: int = dt.datetime.now().year,
     seasons: list[str] | None = None,
     max_concurrent_sessions: int = 25,
+    max_concurrent_classes: int = 500,
     limit_per_host: int = 75,
     timeout: int = 30,
+    detail_cache_path: Path | str | None = None,
+    skip_unchanged_closed_terms: bool = False,
 ) -> bool:
     """
     Runs the SIS scraper for the specified range of years and seasons. The
     earliest available term is Summer 1998 (199805).
 
-    Spawns multiple client sessions to process subjects in parallel, with each
-    session responsible for processing one subject.
+    Processes subjects in parallel, sharing one client session for all class detail
+    requests and spawning a short-lived session for each subject's class search.
 
     @param output_data_dir: Directory to write term course data JSON files to.
     @param start_year: Starting year (inclusive) to scrape data for. Defaults
@@ -496,9 +706,16 @@ async def main(
         three seasons will be processed.
     @param max_concurrent_sessions: Maximum number of concurrent client sessions to
         spawn.
+    @param max_concurrent_classes: Maximum number of classes whose details are fetched
+        concurrently across all subjects and terms.
     @param limit_per_host: Maximum number of simultaneous connections a session
         can make to the SIS server.
     @param timeout: Timeout in seconds for all requests made by a session.
+    @param detail_cache_path: Optional path to a SQLite database used to cache class
+        details between runs. If not provided, all class details are fetched from SIS.
+    @param skip_unchanged_closed_terms: Whether to skip terms that have ended and whose
+        subject list is unchanged since their data was last written. Changes to their
+        classes are not detected, so this is off by default.
     @return: True on success, False on any unhandled failure.
     """
 
@@ -513,23 +730,47 @@ async def main(
 
     # Limit concurrent client sessions and simultaneous connections
     semaphore = asyncio.Semaphore(max_concurrent_sessions)
+    class_semaphore = asyncio.Semaphore(max_concurrent_classes)
 
     logger.info("Starting SIS scraper with settings:")
     logger.info(f"  Years: {start_year} - {end_year}")
     logger.info(f"  Seasons: {', '.join(season.capitalize() for season in seasons)}")
-    logger.info(f"  Max concurrent sessions: {semaphore._value}")
+    logger.info(f"  Max concurrent sessions: {max_concurrent_sessions}")
+    logger.info(f"  Max concurrent classes: {max_concurrent_classes}")
     logger.info(f"  Max concurrent connections per session: {limit_per_host}")
+    logger.info(f"  Detail cache: {detail_cache_path or 'disabled'}")
+    logger.info(f"  Skip unchanged closed terms: {skip_unchanged_closed_terms}")
+
+    # Optional on-disk cache of class details shared by all terms
+    detail_cache = None
+    if detail_cache_path is not None:
+        detail_cache = DetailCache(
+            detail_cache_path, DETAIL_PARSER_VERSION, get_current_term_code()
+        )
 
     tasks: list[asyncio.Task] = []
     num_terms_processed = 0
     try:
         # Global TCP connector for all sessions
-        async with aiohttp.TCPConnector(
-            ttl_dns_cache=500,
-            limit_per_host=limit_per_host,
-            keepalive_timeout=60,
-            force_close=False,
-        ) as tcp_connector:
+        async with (
+            aiohttp.TCPConnector(
+                # Every request goes to the same host, so resolve it on the event loop
+                # with aiodns and cache the result, refreshing it every few minutes in
+                # case the SIS address changes during a long run
+                resolver=aiohttp.AsyncResolver(),
+                ttl_dns_cache=_DNS_CACHE_TTL,
+                limit=limit_per_host * max_concurrent_sessions,
+                limit_per_host=limit_per_host,
+                keepalive_timeout=60,
+                force_close=False,
+                # Skip racing IPv6 and IPv4 connection attempts
+                happy_eyeballs_delay=None,
+            ) as tcp_connector,
+            # Shared session for all stateless requests, which need no cookies
+            sis_session(
+                tcp_connector, timeout, cookie_jar=aiohttp.DummyCookieJar()
+            ) as session,
+        ):
             # Process terms in parallel
             async with asyncio.TaskGroup() as tg:
                 for year in range(start_year, end_year + 1):
@@ -542,9 +783,13 @@ async def main(
                             get_term_course_data(
                                 term,
                                 output_path=output_path,
+                                session=session,
                                 semaphore=semaphore,
                                 tcp_connector=tcp_connector,
                                 timeout=timeout,
+                                detail_cache=detail_cache,
+                                class_semaphore=class_semaphore,
+                                skip_unchanged_closed_terms=skip_unchanged_closed_terms,
                             )
                         )
                         tasks.append(task)
@@ -557,9 +802,13 @@ async def main(
                     num_terms_processed += 1
 
     except Exception as e:
-        logger.fatal(f"Fatal error in SIS scraper: {e}\n{traceback.format_exc()}")
+        logger.fatal(f"Fatal error in SIS scraper: {e}", exc_info=True)
         return False
 
+    finally:
+        if detail_cache is not None:
+            detail_cache.close()
+
     end_time = time.time()
     logger.info("SIS scraper completed")
     logger.info(f"  Terms processed: {num_terms_processed}")